@@ -7,14 +7,12 @@ import os
 import json
 import logging
 import time
-import tiktoken  # pip install tiktoken
 
 from src.chapter_generation import generate_chapterwise_json
 from src.openai_utils import (
     get_chapter_files,
     load_chapter_content,
-    build_prompt,
-    call_openai,
+    generate_chapter_questions,
 )
 from src.text_extraction import extract_text_from_pdf
 
@@ -217,6 +215,8 @@ if st.session_state.confirmed:
             return chunks
 
         def num_tokens_from_string(string: str, model_name: str = "gpt-4o"):
+            import tiktoken  # pip install tiktoken; imported lazily to keep app startup fast
+
             encoding = tiktoken.encoding_for_model(model_name)
             return len(encoding.encode(string))
 
@@ -249,20 +249,17 @@ if st.session_state.confirmed:
                     qb_text = ""
                     for chapter_idx, chapter in enumerate(chapters):
                         file = chapter['file']
-                        chapter_counts = {file: chapter_question_counts[file]}
                         chapter_tokens = num_tokens_from_string(chapter['content'])
                         if chapter_tokens > MAX_TOKENS_PER_CHAPTER:
                             st.warning(f"Chapter '{chapter['name']}' is too large ({chapter_tokens} tokens). Splitting into chunks.")
                             continue  # or handle chunking as before
-                        chapter_prompt = build_prompt(
-                            [{"file": file, "name": chapter['name'], "content": chapter['content']}],
-                            chapter_counts,
-                            difficulties[i],
-                            domain
-                        )
-                        logging.info(f"Prompt built for OpenAI (QB {i+1}, Chapter: {chapter['name']}): {chapter_prompt[:100]}...")
                         try:
-                            questions = call_openai(chapter_prompt)
+                            questions = generate_chapter_questions(
+                                chapter,
+                                chapter_question_counts[file],
+                                difficulties[i],
+                                domain
+                            )
                             qb_text += f"--- {chapter['name']} ---\n{questions}\n\n"
                             logging.info(f"Questions for chapter {chapter['name']} (QB {i+1}) generated.")
                             # Update the placeholder with current questions
@@ -1,16 +1,14 @@
 import os
 import json
 import re
-import logging
 
-# Ensure logs directory exists
-os.makedirs("logs", exist_ok=True)
+try:
+    from src.logging_utils import get_module_logger
+except ImportError:  # run as a script from inside src/
+    from logging_utils import get_module_logger
 
-logging.basicConfig(
-    filename=os.path.join("logs", "chapter_generation.log"),
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(message)s"
-)
+def get_logger():
+    return get_module_logger("chapter_generation", "chapter_generation.log", console=False)
 
 def extract_chapter_info(text):
     """
@@ -33,8 +31,6 @@ def extract_page_number(text):
     return match.group(1) if match else None
 
 def generate_chapterwise_json(pagewise_json_path, output_folder='chapters'):
-    import shutil
-
     with open(pagewise_json_path, 'r', encoding='utf-8') as f:
         pages = json.load(f)
 
@@ -118,7 +114,7 @@ def generate_chapterwise_json(pagewise_json_path, output_folder='chapters'):
         with open(chapter_file, 'w', encoding='utf-8') as f:
             json.dump(chapter, f, ensure_ascii=False, indent=2)
 
-    logging.info(f"Chapterwise JSON files created in '{output_folder}' folder.")
+    get_logger().info(f"Chapterwise JSON files created in '{output_folder}' folder.")
 
 if __name__ == "__main__":
     generate_chapterwise_json('data/pagewise_content.json')
\ No newline at end of file
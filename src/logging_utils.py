@@ -0,0 +1,28 @@
+import os
+import logging
+
+def get_module_logger(name, log_file, console=True, fmt="%(asctime)s %(levelname)s %(message)s"):
+    """
+    Returns the named logger, attaching a file handler in logs/ (and optionally
+    a console handler) on first use, so importing a module has no side effects.
+    The logger does not propagate to the root logger, which app.py configures
+    separately, so each line is written once.
+    """
+    logger = logging.getLogger(name)
+    # Check for our own file handler, since other code (e.g. pytest) may add handlers too
+    if not any(isinstance(handler, logging.FileHandler) for handler in logger.handlers):
+        # Ensure logs directory exists
+        os.makedirs("logs", exist_ok=True)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        formatter = logging.Formatter(fmt)
+
+        file_handler = logging.FileHandler(os.path.join("logs", log_file), encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            logger.addHandler(console_handler)
+    return logger
@@ -1,38 +1,46 @@
 import os
 import json
-from dotenv import load_dotenv
-import openai
-import logging
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-# Ensure logs directory exists
-os.makedirs("logs", exist_ok=True)
+try:
+    from src.logging_utils import get_module_logger
+except ImportError:  # run as a script from inside src/
+    from logging_utils import get_module_logger
 
-# Configure logger to log to both file and console
-logger = logging.getLogger("openai_utils")
-logger.setLevel(logging.INFO)
-formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+# Heavy dependencies (openai, dotenv) and logging/env setup are deferred to
+# first use so importing this module stays cheap and side-effect free.
+def get_logger():
+    return get_module_logger("openai_utils", "openai_utils.log")
 
-# File handler
-file_handler = logging.FileHandler(os.path.join("logs", "openai_utils.log"))
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+@lru_cache(maxsize=None)
+def get_settings():
+    """
+    Loads environment variables once and returns the OpenAI settings.
+    """
+    from dotenv import load_dotenv
 
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+    load_dotenv()
+    settings = {
+        "api_key": "",
+        "model": os.getenv("OPENAI_MODEL", "gpt-4o"),
+        "api_base": os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1"),
+    }
+    get_logger().info("OpenAI API key and base URL loaded successfully.")
+    get_logger().info(f"Using KEY: {settings['api_key'][:40]}... and MODEL: {settings['model']}")
+    return settings
 
-# Load environment variables
-load_dotenv()
-OPENAI_API_KEY = ""
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
-OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+@lru_cache(maxsize=None)
+def get_client():
+    """
+    Returns a shared OpenAI client, importing the openai package on first use.
+    """
+    import openai
 
-openai.api_key = OPENAI_API_KEY
-openai.api_base = OPENAI_API_BASE
-logger.info("OpenAI API key and base URL loaded successfully.")
-logger.info(f"Using KEY: {OPENAI_API_KEY[:40]}... and MODEL: {OPENAI_MODEL}")
+    settings = get_settings()
+    return openai.OpenAI(api_key=settings["api_key"], base_url=settings["api_base"])
 
 def get_chapter_files(chapter_dir="chapters"):
     files = [f for f in os.listdir(chapter_dir) if f.endswith(".json")]
@@ -90,32 +98,301 @@ def build_prompt(chapter_contents, chapter_question_counts, difficulty, domains)
     )
     return prompt
 
-def call_openai(
+DEFAULT_SYSTEM_PROMPT = (
+    "You are an instructor that generates question banks from the provided book content (from a PDF). "
+    "You take user input such as cognitive domains, difficulty levels, type of questions, and chapter selection. "
+    "Generate questions and answers based on these inputs, ensuring each question is relevant to the specified chapter and domain."
+)
+
+def call_openai_with_finish_reason(
     prompt,
-    model=OPENAI_MODEL,
-    system_prompt=(
-        "You are an instructor that generates question banks from the provided book content (from a PDF). "
-        "You take user input such as cognitive domains, difficulty levels, type of questions, and chapter selection. "
-        "Generate questions and answers based on these inputs, ensuring each question is relevant to the specified chapter and domain."
-    )
+    model=None,
+    system_prompt=DEFAULT_SYSTEM_PROMPT,
+    max_tokens=1024
 ):
-    client = openai.OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_API_BASE)
+    """
+    Same as call_openai, but returns (content, finish_reason) so callers can
+    detect truncated completions (finish_reason == "length").
+    """
     try:
-        response = client.chat.completions.create(
-            model=model,
+        response = get_client().chat.completions.create(
+            model=model or get_settings()["model"],
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=1024,
+            max_tokens=max_tokens,
             temperature=0.7,
         )
-        logger.info("OpenAI API call successful.")
-        return response.choices[0].message.content.strip()
+        get_logger().info("OpenAI API call successful.")
+        choice = response.choices[0]
+        return choice.message.content.strip(), choice.finish_reason
     except Exception as e:
-        logger.error(f"OpenAI API call failed: {e}")
+        get_logger().error(f"OpenAI API call failed: {e}")
         raise
 
+def call_openai(
+    prompt,
+    model=None,
+    system_prompt=DEFAULT_SYSTEM_PROMPT,
+    max_tokens=1024
+):
+    content, _ = call_openai_with_finish_reason(prompt, model, system_prompt, max_tokens)
+    return content
+
+# Average completion tokens per question in the output format requested by
+# build_prompt (question, domain tag, options and answer). These are starting
+# values sized for typical gpt-4o questions in that format, not measurements;
+# re-derive them from saved question banks with measure_question_token_averages()
+# and update the table. TOKEN_ESTIMATE_MARGIN covers the spread around the average.
+QUESTION_TOKEN_ESTIMATES = {"mcq": 110, "tf": 45, "short": 80}
+RESPONSE_OVERHEAD_TOKENS = 64
+TOKEN_ESTIMATE_MARGIN = 1.2
+MAX_COMPLETION_TOKENS = 4096
+MAX_CONTINUATIONS = 2
+
+def estimate_completion_tokens(counts):
+    """
+    Estimates the completion tokens needed for the given question counts.
+    counts: dict with 'mcq', 'tf', 'short'
+    """
+    question_tokens = sum(counts.get(q_type, 0) * QUESTION_TOKEN_ESTIMATES[q_type] for q_type in QUESTION_TOKEN_ESTIMATES)
+    return RESPONSE_OVERHEAD_TOKENS + int(question_tokens * TOKEN_ESTIMATE_MARGIN)
+
+def split_question_counts(counts, max_tokens=MAX_COMPLETION_TOKENS):
+    """
+    Splits question counts into sub-requests whose estimated completion fits in
+    max_tokens. Oversize requests are split by question type first, then each
+    type is chunked further if it is still too large on its own.
+    Returns a list of counts dicts.
+    """
+    if estimate_completion_tokens(counts) <= max_tokens:
+        return [counts]
+    parts = []
+    for q_type, per_question in QUESTION_TOKEN_ESTIMATES.items():
+        total = counts.get(q_type, 0)
+        per_part = max(1, int((max_tokens - RESPONSE_OVERHEAD_TOKENS) / (per_question * TOKEN_ESTIMATE_MARGIN)))
+        for start in range(0, total, per_part):
+            part = {"mcq": 0, "tf": 0, "short": 0}
+            part[q_type] = min(per_part, total - start)
+            parts.append(part)
+    return parts
+
+QUESTION_TYPE_LABELS = {"mcq": "MCQ", "tf": "True/False", "short": "Short Answer"}
+SECTION_PATTERNS = {
+    "mcq": re.compile(r"^mcqs?\s*:?$"),
+    "tf": re.compile(r"^true\s*/\s*false\s*:?$"),
+    "short": re.compile(r"^short\s*answers?\s*:?$"),
+}
+QUESTION_PATTERN = re.compile(r"^[*#\s]*Q\d+\s*[.):][*\s]*", re.IGNORECASE)
+ANSWER_PATTERN = re.compile(r"^(correct\s+)?(answer|ans)\b[\s*.]*[:\-]", re.IGNORECASE)
+
+def single_question_type(counts):
+    """
+    Returns the question type if counts asks for exactly one type, else None.
+    """
+    requested = [q_type for q_type in QUESTION_TYPE_LABELS if counts.get(q_type, 0) > 0]
+    return requested[0] if len(requested) == 1 else None
+
+def parse_question_sections(text, default_type=None):
+    """
+    Parses generated output into question blocks per type. Each block is a dict
+    with 'text' (question without its 'Qn.' prefix, plus options and answer),
+    'complete' (an 'Answer:' line was seen) and 'end' (offset in text after the
+    block's last line). Text outside a section uses default_type, if given.
+    """
+    sections = {q_type: [] for q_type in QUESTION_TYPE_LABELS}
+    current_type = default_type
+    current = None
+    position = 0
+    for line in text.splitlines(keepends=True):
+        position += len(line)
+        stripped = line.strip().strip("*#").strip()
+        section_type = next(
+            (q_type for q_type, pattern in SECTION_PATTERNS.items() if pattern.match(stripped.lower())),
+            None
+        )
+        if section_type:
+            current_type = section_type
+            current = None
+        elif QUESTION_PATTERN.match(line):
+            current = None
+            if current_type:
+                current = {"lines": [QUESTION_PATTERN.sub("", line.strip())], "complete": False, "end": position}
+                sections[current_type].append(current)
+        elif current is not None:
+            current["lines"].append(line.rstrip())
+            current["end"] = position
+            if ANSWER_PATTERN.match(stripped):
+                current["complete"] = True
+    return {
+        q_type: [
+            {"text": "\n".join(block["lines"]).strip(), "complete": block["complete"], "end": block["end"]}
+            for block in blocks
+        ]
+        for q_type, blocks in sections.items()
+    }
+
+def count_completed_questions(text, default_type=None):
+    """
+    Counts questions per type that were generated up to and including their
+    'Answer:' line. Returns (counts, text trimmed after the last completed question).
+    """
+    sections = parse_question_sections(text, default_type)
+    counts = {q_type: sum(block["complete"] for block in blocks) for q_type, blocks in sections.items()}
+    complete_end = max(
+        (block["end"] for blocks in sections.values() for block in blocks if block["complete"]),
+        default=0
+    )
+    return counts, text[:complete_end].rstrip()
+
+def measure_question_token_averages(texts, model_name="gpt-4o", count_tokens=None):
+    """
+    Measures average completion tokens per question type over generated outputs
+    (e.g. downloaded question bank .txt files), for updating QUESTION_TOKEN_ESTIMATES.
+    count_tokens: optional callable(str) -> int; defaults to tiktoken for model_name.
+    Returns a dict with the rounded average for each type that had samples.
+    """
+    if count_tokens is None:
+        import tiktoken
+
+        encoding = tiktoken.encoding_for_model(model_name)
+        count_tokens = lambda text: len(encoding.encode(text))
+    totals = {q_type: [0, 0] for q_type in QUESTION_TOKEN_ESTIMATES}
+    for text in texts:
+        for q_type, blocks in parse_question_sections(text).items():
+            for idx, block in enumerate(blocks, 1):
+                if block["complete"]:
+                    totals[q_type][0] += count_tokens(f"Q{idx}. {block['text']}\n\n")
+                    totals[q_type][1] += 1
+    return {q_type: round(tokens / questions) for q_type, (tokens, questions) in totals.items() if questions}
+
+def kept_question_blocks(sections, truncated=False):
+    """
+    Returns the question texts per type worth keeping from parsed output. Every
+    block is kept, except that a truncated output (finish_reason == "length")
+    drops its trailing block when that block never reached its answer line.
+    """
+    dropped = None
+    if truncated:
+        blocks = [block for blocks in sections.values() for block in blocks]
+        last = max(blocks, key=lambda block: block["end"], default=None)
+        if last is not None and not last["complete"]:
+            dropped = last
+    return {
+        q_type: [block["text"] for block in blocks if block is not dropped]
+        for q_type, blocks in sections.items()
+    }
+
+def format_question_sections(sections):
+    """
+    Formats question blocks per type back into the build_prompt output format,
+    numbering each section from Q1.
+    """
+    formatted = []
+    for q_type, label in QUESTION_TYPE_LABELS.items():
+        blocks = sections.get(q_type, [])
+        if blocks:
+            questions = "\n\n".join(f"Q{idx}. {block}" for idx, block in enumerate(blocks, 1))
+            formatted.append(f"{label}:\n{questions}")
+    return "\n\n".join(formatted)
+
+def merge_question_outputs(texts, default_types=None, truncated=None):
+    """
+    Merges several generated outputs for the same chapter into one set of
+    sections with continuous numbering. truncated holds one flag per text for
+    outputs that ended with finish_reason == "length". Falls back to joining the
+    raw texts if any of them yields no questions.
+    """
+    default_types = default_types or [None] * len(texts)
+    truncated = truncated or [False] * len(texts)
+    merged = {q_type: [] for q_type in QUESTION_TYPE_LABELS}
+    for text, default_type, is_truncated in zip(texts, default_types, truncated):
+        kept = kept_question_blocks(parse_question_sections(text, default_type), is_truncated)
+        if text.strip() and not any(kept.values()):
+            get_logger().warning("Could not parse questions from one of the outputs; joining them as is.")
+            return "\n\n".join(text for text in texts if text)
+        for q_type, blocks in kept.items():
+            merged[q_type].extend(blocks)
+    return format_question_sections(merged)
+
+def build_continuation_prompt(chapter, remaining, generated, difficulty, domains):
+    """
+    Builds the follow-up prompt after a truncated response: asks for only the
+    remaining counts, says where numbering continues, and lists the questions
+    that already exist so they are not repeated.
+    generated: dict mapping question type to the completed question blocks so far
+    """
+    prompt = build_prompt([chapter], {chapter['file']: remaining}, difficulty, domains)
+    prompt += "\n\nAn earlier response for this chapter was cut off. Generate ONLY these missing questions:\n"
+    for q_type, label in QUESTION_TYPE_LABELS.items():
+        if remaining.get(q_type, 0) > 0:
+            start = len(generated[q_type]) + 1
+            prompt += f"- {label}: {remaining[q_type]} more, numbered from Q{start} to Q{start + remaining[q_type] - 1}\n"
+    existing = [block.splitlines()[0] for blocks in generated.values() for block in blocks]
+    if existing:
+        prompt += "Do not repeat any of these already generated questions:\n"
+        prompt += "".join(f"- {question}\n" for question in existing)
+    return prompt
+
+def generate_with_continuation(chapter, counts, difficulty, domains, model=None):
+    """
+    Generates questions for one chapter with max_tokens sized from the requested
+    counts. If the completion is cut off (finish_reason == "length"), keeps the
+    completed questions and asks again for only the missing ones, then merges
+    everything into one set of sections.
+    """
+    remaining = dict(counts)
+    default_type = single_question_type(counts)
+    max_tokens = min(estimate_completion_tokens(remaining), MAX_COMPLETION_TOKENS)
+    generated = {q_type: [] for q_type in QUESTION_TYPE_LABELS}
+    for attempt in range(MAX_CONTINUATIONS + 1):
+        if attempt == 0:
+            prompt = build_prompt([chapter], {chapter['file']: remaining}, difficulty, domains)
+        else:
+            prompt = build_continuation_prompt(chapter, remaining, generated, difficulty, domains)
+        text, finish_reason = call_openai_with_finish_reason(prompt, model=model, max_tokens=max_tokens)
+        if finish_reason != "length" and attempt == 0:
+            return text
+
+        kept = kept_question_blocks(parse_question_sections(text, default_type), finish_reason == "length")
+        if finish_reason != "length" and text.strip() and not any(kept.values()):
+            get_logger().warning(f"Could not parse continuation output for chapter {chapter['name']}; appending it as is.")
+            return format_question_sections(generated) + "\n\n" + text
+        done = {q_type: 0 for q_type in QUESTION_TYPE_LABELS}
+        for q_type, blocks in kept.items():
+            for block in blocks:
+                if done[q_type] < remaining.get(q_type, 0):
+                    generated[q_type].append(block)
+                    done[q_type] += 1
+        remaining = {q_type: max(remaining.get(q_type, 0) - done[q_type], 0) for q_type in QUESTION_TYPE_LABELS}
+        if finish_reason != "length" or not any(remaining.values()):
+            return format_question_sections(generated)
+        get_logger().warning(f"Output truncated for chapter {chapter['name']}, requesting missing questions: {remaining}")
+        if any(done.values()):
+            max_tokens = min(estimate_completion_tokens(remaining), MAX_COMPLETION_TOKENS)
+        else:
+            max_tokens = min(max_tokens * 2, MAX_COMPLETION_TOKENS)
+    get_logger().error(f"Questions still missing for chapter {chapter['name']} after {MAX_CONTINUATIONS} continuations: {remaining}")
+    return format_question_sections(generated)
+
+def generate_chapter_questions(chapter, counts, difficulty, domains, model=None, max_workers=3):
+    """
+    Generates the requested questions for one chapter. Requests too large for a
+    single completion are split by question type and run as parallel sub-requests,
+    whose outputs are merged into one set of sections.
+    """
+    parts = split_question_counts(counts)
+    if len(parts) == 1:
+        return generate_with_continuation(chapter, counts, difficulty, domains, model=model)
+    get_logger().info(f"Splitting chapter {chapter['name']} into {len(parts)} sub-requests.")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            lambda part: generate_with_continuation(chapter, part, difficulty, domains, model=model),
+            parts
+        ))
+    return merge_question_outputs(results, [single_question_type(part) for part in parts])
+
 def split_text(text, max_words=150):
     """
     Splits text into chunks of approximately max_words (words, as a proxy).
@@ -182,18 +459,325 @@ def generate_questions_per_chapter(
                 "\nMake sure the domain is randomly assigned per question and shown beside each question.\n"
                 "Do not generate more than the specified number of each question type."
             )
-            logger.info(f"Prompt length (chars): {len(single_chapter_prompt)}")
-            logger.info(f"Prompt preview: {single_chapter_prompt[:500]}")  # Log first 500 chars
+            get_logger().info(f"Prompt length (chars): {len(single_chapter_prompt)}")
+            get_logger().info(f"Prompt preview: {single_chapter_prompt[:500]}")  # Log first 500 chars
             try:
                 result = call_openai(
                     prompt=single_chapter_prompt,
-                    model=OPENAI_MODEL
+                    max_tokens=min(estimate_completion_tokens(counts), MAX_COMPLETION_TOKENS)
                 )
                 chapter_results.append(result)
-                logger.info(f"Questions generated for chapter: {chapter['name']} chunk {idx+1}")
+                get_logger().info(f"Questions generated for chapter: {chapter['name']} chunk {idx+1}")
                 time.sleep(2)  # <-- Add a delay (2 seconds) between requests
             except Exception as e:
-                logger.error(f"Failed to generate questions for chapter {chapter['name']} chunk {idx+1}: {e}")
+                get_logger().error(f"Failed to generate questions for chapter {chapter['name']} chunk {idx+1}: {e}")
                 chapter_results.append(None)
         results[file] = chapter_results
-    return results
\ No newline at end of file
+    return results
+
+BATCH_DIR = "batches"
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+def make_custom_id(qb_idx, chapter_file, part_idx=0):
+    return f"qb{qb_idx}::{chapter_file}::part{part_idx}"
+
+def parse_custom_id(custom_id):
+    qb_part, rest = custom_id.split("::", 1)
+    chapter_file, part = rest.rsplit("::", 1)
+    return int(qb_part[len("qb"):]), chapter_file, int(part[len("part"):])
+
+def build_batch_requests(
+    chapter_contents,
+    chapter_question_counts,
+    difficulties,
+    domains,
+    model=None,
+    system_prompt=DEFAULT_SYSTEM_PROMPT
+):
+    """
+    Builds one Batch API request per (question bank, chapter) pair, split into
+    parts when the requested counts do not fit in one completion.
+    difficulties: list with one difficulty per question bank
+    Returns a list of dicts ready to be written as JSONL lines.
+    """
+    batch_requests = []
+    for qb_idx, difficulty in enumerate(difficulties):
+        for chapter in chapter_contents:
+            file = chapter['file']
+            counts = chapter_question_counts.get(file, {"mcq": 0, "tf": 0, "short": 0})
+            if counts["mcq"] == 0 and counts["tf"] == 0 and counts["short"] == 0:
+                continue
+            for part_idx, part in enumerate(split_question_counts(counts)):
+                prompt = build_prompt([chapter], {file: part}, difficulty, domains)
+                batch_requests.append({
+                    "custom_id": make_custom_id(qb_idx, file, part_idx),
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": {
+                        "model": model or get_settings()["model"],
+                        "messages": [
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": prompt}
+                        ],
+                        "max_tokens": min(estimate_completion_tokens(part), MAX_COMPLETION_TOKENS),
+                        "temperature": 0.7,
+                    }
+                })
+    return batch_requests
+
+def write_batch_file(batch_requests, path=None):
+    """
+    Writes batch requests to a JSONL file (one request per line).
+    Defaults to a timestamped file in the batches directory.
+    """
+    if path is None:
+        path = os.path.join(BATCH_DIR, f"batch_input_{int(time.time())}.jsonl")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for request in batch_requests:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+    get_logger().info(f"Wrote {len(batch_requests)} batch requests to {path}")
+    return path
+
+class OpenAIBatchBackend:
+    """
+    Submits batch files through the OpenAI Files and Batch APIs.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or get_client()
+
+    def submit(self, input_path):
+        with open(input_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        get_logger().info(f"Submitted batch {batch.id} (input file {input_file.id}).")
+        return batch.id
+
+    def status(self, batch_id):
+        return self.client.batches.retrieve(batch_id).status
+
+    def fetch_results(self, batch_id):
+        batch = self.client.batches.retrieve(batch_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = self.client.files.content(file_id).text
+                lines.extend(json.loads(line) for line in content.splitlines() if line.strip())
+        return lines
+
+class LocalBatchBackend:
+    """
+    File-based stand-in for the Batch API, for running batch jobs offline.
+    Each request body is passed to `responder`, whose return value becomes the
+    message content of the result line; it may also return (content, finish_reason).
+    """
+
+    def __init__(self, responder=None, batch_dir=BATCH_DIR):
+        self.responder = responder or (lambda body: "")
+        self.batch_dir = batch_dir
+
+    def _output_path(self, batch_id):
+        return os.path.join(self.batch_dir, f"{batch_id}_output.jsonl")
+
+    def submit(self, input_path):
+        os.makedirs(self.batch_dir, exist_ok=True)
+        batch_id = f"local_batch_{int(time.time() * 1000)}"
+        with open(input_path, "r", encoding="utf-8") as f_in, \
+                open(self._output_path(batch_id), "w", encoding="utf-8") as f_out:
+            for line in f_in:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                content = self.responder(request["body"])
+                content, finish_reason = content if isinstance(content, tuple) else (content, "stop")
+                result = {
+                    "id": f"{batch_id}_{request['custom_id']}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "choices": [{
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": finish_reason
+                            }]
+                        }
+                    },
+                    "error": None
+                }
+                f_out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        get_logger().info(f"Processed local batch {batch_id} from {input_path}.")
+        return batch_id
+
+    def status(self, batch_id):
+        return "completed" if os.path.exists(self._output_path(batch_id)) else "failed"
+
+    def fetch_results(self, batch_id):
+        with open(self._output_path(batch_id), "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+def poll_batch(backend, batch_id, initial_delay=10, max_delay=600, backoff=2, timeout=24 * 60 * 60):
+    """
+    Polls the batch status with exponential backoff until it reaches a terminal state.
+    Returns the final status.
+    """
+    delay = initial_delay
+    start = time.time()
+    while True:
+        status = backend.status(batch_id)
+        get_logger().info(f"Batch {batch_id} status: {status}")
+        if status in BATCH_TERMINAL_STATUSES:
+            return status
+        if time.time() - start + delay > timeout:
+            raise TimeoutError(f"Batch {batch_id} did not finish within {timeout} seconds.")
+        time.sleep(delay)
+        delay = min(delay * backoff, max_delay)
+
+def parse_batch_result(result):
+    """
+    Returns (content, finish_reason) for a successful batch result line, or None
+    if the request failed.
+    """
+    response = result.get("response") or {}
+    if result.get("error") or response.get("status_code") != 200:
+        return None
+    choice = response["body"]["choices"][0]
+    return choice["message"]["content"].strip(), choice.get("finish_reason")
+
+def map_batch_results(results, chapter_contents, num_question_banks):
+    """
+    Maps batch result lines back into question banks using their custom IDs.
+    Truncated results (finish_reason == "length") are trimmed to their completed
+    questions. Returns a list with one question bank text per bank, chapters in
+    their original order.
+    """
+    by_chapter = {}
+    for result in results:
+        custom_id = result.get("custom_id")
+        parsed = parse_batch_result(result)
+        if parsed is None:
+            get_logger().error(f"Batch request {custom_id} failed: {result.get('error') or result.get('response')}")
+            continue
+        content, finish_reason = parsed
+        if finish_reason == "length":
+            _, content = count_completed_questions(content)
+            get_logger().warning(f"Batch request {custom_id} was truncated; keeping only its completed questions.")
+            if not content:
+                continue
+        qb_idx, chapter_file, part_idx = parse_custom_id(custom_id)
+        by_chapter.setdefault((qb_idx, chapter_file), []).append((part_idx, content))
+
+    qb_results = []
+    for qb_idx in range(num_question_banks):
+        qb_text = ""
+        for chapter in chapter_contents:
+            parts = by_chapter.get((qb_idx, chapter['file']))
+            if parts:
+                contents = [content for _, content in sorted(parts)]
+                questions = contents[0] if len(contents) == 1 else merge_question_outputs(contents)
+                qb_text += f"--- {chapter['name']} ---\n{questions}\n\n"
+        qb_results.append(qb_text)
+    return qb_results
+
+def incomplete_batch_requests(batch_requests, results):
+    """
+    Returns the custom IDs of batch requests that need a follow-up request:
+    those with no result, a failed result or a truncated one, in request order.
+    """
+    finished = set()
+    for result in results:
+        parsed = parse_batch_result(result)
+        if parsed is not None and parsed[1] != "length":
+            finished.add(result.get("custom_id"))
+    return [request["custom_id"] for request in batch_requests if request["custom_id"] not in finished]
+
+def generate_question_banks_batch(
+    chapter_contents,
+    chapter_question_counts,
+    difficulties,
+    domains,
+    model=None,
+    system_prompt=DEFAULT_SYSTEM_PROMPT,
+    backend=None,
+    input_path=None,
+    **poll_kwargs
+):
+    """
+    Offline alternative to calling the API per chapter: writes all (bank, chapter)
+    requests to one JSONL file, submits it as a batch, waits for it to finish and
+    returns the question bank texts. Expired or cancelled batches still return
+    whatever results they finished; requests without a usable result are logged.
+    """
+    backend = backend or OpenAIBatchBackend()
+    batch_requests = build_batch_requests(
+        chapter_contents,
+        chapter_question_counts,
+        difficulties,
+        domains,
+        model=model,
+        system_prompt=system_prompt
+    )
+    input_path = write_batch_file(batch_requests, path=input_path)
+    batch_id = backend.submit(input_path)
+    status = poll_batch(backend, batch_id, **poll_kwargs)
+    if status == "failed":
+        raise RuntimeError(f"Batch {batch_id} ended with status: {status}")
+    if status != "completed":
+        get_logger().warning(f"Batch {batch_id} ended with status: {status}; keeping the results it finished.")
+    results = backend.fetch_results(batch_id)
+    get_logger().info(f"Batch {batch_id} returned {len(results)} results.")
+    incomplete = incomplete_batch_requests(batch_requests, results)
+    if incomplete:
+        get_logger().warning(f"Batch {batch_id} requests needing a follow-up request: {', '.join(incomplete)}")
+    return map_batch_results(results, chapter_contents, len(difficulties))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generate question banks as an offline Batch API job (e.g. overnight)."
+    )
+    parser.add_argument("--banks", type=int, default=1, help="Number of question banks to generate.")
+    parser.add_argument("--difficulty", nargs="+", default=["Medium"],
+                        help="Difficulty per question bank; the last value is reused for remaining banks.")
+    parser.add_argument("--domains", nargs="+", default=["Knowledge", "Comprehension", "Application"])
+    parser.add_argument("--mcq", type=int, default=5, help="MCQs per chapter.")
+    parser.add_argument("--tf", type=int, default=5, help="True/False questions per chapter.")
+    parser.add_argument("--short", type=int, default=5, help="Short answer questions per chapter.")
+    parser.add_argument("--chapters", nargs="+", help="Chapter JSON files to use (default: all).")
+    parser.add_argument("--chapter-dir", default="chapters")
+    parser.add_argument("--output-dir", default="question_banks")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--local", action="store_true",
+                        help="Use the file-based LocalBatchBackend instead of the OpenAI Batch API.")
+    args = parser.parse_args()
+
+    chapter_files = args.chapters or get_chapter_files(chapter_dir=args.chapter_dir)
+    chapters = load_chapter_content(chapter_files, chapter_dir=args.chapter_dir)
+    counts = {"mcq": args.mcq, "tf": args.tf, "short": args.short}
+    chapter_question_counts = {chapter['file']: counts for chapter in chapters}
+    difficulties = [args.difficulty[min(i, len(args.difficulty) - 1)] for i in range(args.banks)]
+
+    qb_results = generate_question_banks_batch(
+        chapters,
+        chapter_question_counts,
+        difficulties,
+        args.domains,
+        model=args.model,
+        backend=LocalBatchBackend() if args.local else None,
+    )
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for i, qb_text in enumerate(qb_results, 1):
+        out_file = os.path.join(args.output_dir, f"question_bank_{i}.txt")
+        with open(out_file, "w", encoding="utf-8") as f:
+            f.write(qb_text)
+        print(f"Question bank {i} saved to {out_file}.")
@@ -1,23 +1,14 @@
 import re
-import pandas as pd
-import pytesseract
-from pdf2image import convert_from_path
 import json
-import logging
 import os
-import pdfplumber
 
-# Ensure logs directory exists
-os.makedirs("logs", exist_ok=True)
+try:
+    from src.logging_utils import get_module_logger
+except ImportError:  # run as a script from inside src/
+    from logging_utils import get_module_logger
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(os.path.join("logs", "extraction.log"), encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
+def get_logger():
+    return get_module_logger("text_extraction", "extraction.log", fmt="%(asctime)s [%(levelname)s] %(message)s")
 
 def extract_page_number_from_text(text):
     """
@@ -32,13 +23,17 @@ def extract_page_number_from_text(text):
     return None
 
 def extract_text_from_pdf(pdf_path):
-    logging.info(f"Starting text extraction from PDF: {pdf_path}")
+    # OCR dependencies are slow to import, so load them only when extracting
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    get_logger().info(f"Starting text extraction from PDF: {pdf_path}")
     images = convert_from_path(pdf_path)
-    logging.info(f"Converted PDF to {len(images)} images/pages.")
+    get_logger().info(f"Converted PDF to {len(images)} images/pages.")
     pages = []
     assigned_page_num = 1
     for idx, image in enumerate(images):
-        logging.info(f"Processing page {idx + 1}")
+        get_logger().info(f"Processing page {idx + 1}")
         text = pytesseract.image_to_string(image, lang='eng')
         detected_page_num = extract_page_number_from_text(text)
         page_number = detected_page_num if detected_page_num is not None else assigned_page_num
@@ -47,7 +42,7 @@ def extract_text_from_pdf(pdf_path):
             'content': text
         })
         assigned_page_num += 1
-    logging.info(f"Extraction complete. Extracted {len(pages)} pages.")
+    get_logger().info(f"Extraction complete. Extracted {len(pages)} pages.")
     return pages
 
 
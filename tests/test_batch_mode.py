@@ -0,0 +1,171 @@
+import json
+
+import pytest
+
+from src import openai_utils as ou
+
+CHAPTERS = [
+    {"file": "chapter_1.json", "name": "1: Networks", "content": "network content"},
+    {"file": "chapter_2.json", "name": "2: Layers", "content": "layer content"},
+]
+
+
+def result_line(custom_id, content, status_code=200, error=None, finish_reason="stop"):
+    return {
+        "custom_id": custom_id,
+        "response": {
+            "status_code": status_code,
+            "body": {"choices": [{"message": {"content": content}, "finish_reason": finish_reason}]},
+        },
+        "error": error,
+    }
+
+
+@pytest.mark.parametrize("chapter_file", ["chapter_1.json", "odd::name.json"])
+def test_custom_id_round_trip(chapter_file):
+    custom_id = ou.make_custom_id(3, chapter_file, 2)
+    assert ou.parse_custom_id(custom_id) == (3, chapter_file, 2)
+
+
+def test_build_batch_requests_skips_empty_chapters_and_uses_model():
+    counts = {
+        "chapter_1.json": {"mcq": 1, "tf": 0, "short": 1},
+        "chapter_2.json": {"mcq": 0, "tf": 0, "short": 0},
+    }
+    requests = ou.build_batch_requests(CHAPTERS, counts, ["Easy", "Hard"], ["Knowledge"], model="test-model")
+    assert [r["custom_id"] for r in requests] == [
+        ou.make_custom_id(0, "chapter_1.json"),
+        ou.make_custom_id(1, "chapter_1.json"),
+    ]
+    assert all(r["body"]["model"] == "test-model" for r in requests)
+    assert "'Hard' difficulty" in requests[1]["body"]["messages"][1]["content"]
+
+
+def test_map_batch_results_orders_parts_and_skips_failures():
+    results = [
+        result_line(ou.make_custom_id(0, "chapter_1.json", 1), "True/False:\nQ1. t\nAnswer: True"),
+        result_line(ou.make_custom_id(0, "chapter_1.json", 0), "MCQ:\nQ1. a\nAnswer: A"),
+        result_line(ou.make_custom_id(0, "chapter_2.json"), "ignored", status_code=500),
+        result_line(ou.make_custom_id(1, "chapter_2.json"), "ignored", error={"message": "boom"}),
+        result_line(ou.make_custom_id(1, "chapter_1.json"), "raw answer"),
+    ]
+    qb_results = ou.map_batch_results(results, CHAPTERS, 2)
+    assert qb_results == [
+        "--- 1: Networks ---\nMCQ:\nQ1. a\nAnswer: A\n\nTrue/False:\nQ1. t\nAnswer: True\n\n",
+        "--- 1: Networks ---\nraw answer\n\n",
+    ]
+
+
+def test_map_batch_results_trims_truncated_results(caplog):
+    custom_id = ou.make_custom_id(0, "chapter_1.json")
+    results = [result_line(custom_id, "MCQ:\nQ1. a\nAnswer: A\n\nQ2. cut", finish_reason="length")]
+    assert ou.map_batch_results(results, CHAPTERS, 1) == ["--- 1: Networks ---\nMCQ:\nQ1. a\nAnswer: A\n\n"]
+    assert f"Batch request {custom_id} was truncated" in caplog.text
+
+
+def test_incomplete_batch_requests_reports_missing_failed_and_truncated():
+    requests = [{"custom_id": ou.make_custom_id(0, f"chapter_{idx}.json")} for idx in range(4)]
+    results = [
+        result_line(requests[0]["custom_id"], "ok"),
+        result_line(requests[1]["custom_id"], "cut", finish_reason="length"),
+        result_line(requests[2]["custom_id"], "boom", status_code=500),
+    ]
+    assert ou.incomplete_batch_requests(requests, results) == [
+        requests[1]["custom_id"], requests[2]["custom_id"], requests[3]["custom_id"]
+    ]
+
+
+def test_generate_question_banks_batch_with_local_backend(tmp_path):
+    counts = {
+        "chapter_1.json": {"mcq": 1, "tf": 0, "short": 0},
+        "chapter_2.json": {"mcq": 0, "tf": 1, "short": 0},
+    }
+    backend = ou.LocalBatchBackend(
+        responder=lambda body: f"{body['model']}|{body['messages'][0]['content']}",
+        batch_dir=str(tmp_path / "out"),
+    )
+    input_path = tmp_path / "input.jsonl"
+    qb_results = ou.generate_question_banks_batch(
+        CHAPTERS,
+        counts,
+        ["Easy", "Medium"],
+        ["Knowledge"],
+        model="test-model",
+        system_prompt="SYS",
+        backend=backend,
+        input_path=str(input_path),
+        initial_delay=0,
+    )
+    lines = [json.loads(line) for line in input_path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 4
+    assert qb_results[1] == (
+        "--- 1: Networks ---\ntest-model|SYS\n\n--- 2: Layers ---\ntest-model|SYS\n\n"
+    )
+
+
+class FakeBackend:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+
+    def status(self, batch_id):
+        return self.statuses.pop(0)
+
+
+def test_poll_batch_backs_off_until_terminal(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(ou.time, "sleep", sleeps.append)
+    backend = FakeBackend(["validating", "in_progress", "in_progress", "in_progress", "completed"])
+    status = ou.poll_batch(backend, "batch_1", initial_delay=1, max_delay=5, backoff=2)
+    assert status == "completed"
+    assert sleeps == [1, 2, 4, 5]
+
+
+def test_poll_batch_times_out(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(ou.time, "time", lambda: clock[0])
+    monkeypatch.setattr(ou.time, "sleep", lambda seconds: clock.__setitem__(0, clock[0] + seconds))
+    backend = FakeBackend(["in_progress"] * 10)
+    with pytest.raises(TimeoutError):
+        ou.poll_batch(backend, "batch_1", initial_delay=10, max_delay=10, timeout=25)
+
+
+def test_generate_question_banks_batch_raises_on_failed_batch(monkeypatch):
+    class FailingBackend(ou.LocalBatchBackend):
+        def status(self, batch_id):
+            return "failed"
+
+    with pytest.raises(RuntimeError):
+        ou.generate_question_banks_batch(
+            CHAPTERS,
+            {"chapter_1.json": {"mcq": 1, "tf": 0, "short": 0}},
+            ["Easy"],
+            ["Knowledge"],
+            model="test-model",
+            backend=FailingBackend(),
+            initial_delay=0,
+        )
+
+
+def test_generate_question_banks_batch_keeps_results_of_expired_batch(caplog):
+    class ExpiredBackend(ou.LocalBatchBackend):
+        def status(self, batch_id):
+            return "expired"
+
+        def fetch_results(self, batch_id):
+            return super().fetch_results(batch_id)[:1]
+
+    qb_results = ou.generate_question_banks_batch(
+        CHAPTERS,
+        {
+            "chapter_1.json": {"mcq": 1, "tf": 0, "short": 0},
+            "chapter_2.json": {"mcq": 1, "tf": 0, "short": 0},
+        },
+        ["Easy"],
+        ["Knowledge"],
+        model="test-model",
+        backend=ExpiredBackend(responder=lambda body: "questions"),
+        initial_delay=0,
+    )
+    assert qb_results == ["--- 1: Networks ---\nquestions\n\n"]
+    assert "ended with status: expired" in caplog.text
+    assert ou.make_custom_id(0, "chapter_2.json") in caplog.text
@@ -0,0 +1,46 @@
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY_MODULES = ["openai", "dotenv", "pytesseract", "pdf2image", "pandas", "pdfplumber"]
+# Generous ceiling on the cumulative import time of the src modules, in microseconds
+MAX_CUMULATIVE_US = 500_000
+
+
+def import_src_modules(cwd):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         "import src.openai_utils, src.text_extraction, src.chapter_generation"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+
+def test_import_loads_no_heavy_dependencies(tmp_path):
+    importtime = import_src_modules(tmp_path)
+    imported = {line.rsplit("|", 1)[-1].strip() for line in importtime.splitlines() if "|" in line}
+    top_level = {name.strip().split(".")[0] for name in imported}
+    for module in HEAVY_MODULES:
+        assert module not in top_level, f"{module} is imported when loading src modules"
+
+
+def test_import_has_no_side_effects(tmp_path):
+    import_src_modules(tmp_path)
+    assert not (tmp_path / "logs").exists()
+    assert os.listdir(tmp_path) == []
+
+
+def test_import_time_ceiling(tmp_path):
+    importtime = import_src_modules(tmp_path)
+    cumulative = 0
+    for line in importtime.splitlines():
+        match = re.match(r"import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*(src\.\w+)$", line)
+        if match:
+            cumulative += int(match.group(1))
+    assert 0 < cumulative < MAX_CUMULATIVE_US
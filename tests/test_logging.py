@@ -0,0 +1,65 @@
+import logging
+
+import pytest
+
+from src import chapter_generation, openai_utils, text_extraction
+
+MODULE_LOGGERS = ["chapter_generation", "text_extraction", "openai_utils"]
+
+
+def clear_handlers(logger):
+    for handler in logger.handlers:
+        handler.close()
+    logger.handlers.clear()
+
+
+@pytest.fixture
+def fresh_loggers():
+    """Start from unconfigured module loggers and restore the root logger afterwards."""
+    root_handlers = logging.root.handlers[:]
+    root_level = logging.root.level
+    for name in MODULE_LOGGERS:
+        clear_handlers(logging.getLogger(name))
+    logging.root.handlers = []
+    yield
+    for name in MODULE_LOGGERS:
+        clear_handlers(logging.getLogger(name))
+    for handler in logging.root.handlers:
+        if handler not in root_handlers:
+            handler.close()
+    logging.root.handlers = root_handlers
+    logging.root.setLevel(root_level)
+
+
+@pytest.mark.parametrize("module, log_file", [
+    (chapter_generation, "chapter_generation.log"),
+    (text_extraction, "extraction.log"),
+    (openai_utils, "openai_utils.log"),
+])
+def test_module_log_file_written_after_root_basic_config(tmp_path, fresh_loggers, module, log_file):
+    # app.py configures the root logger before any module logger is used
+    logging.basicConfig(level=logging.INFO)
+    logger = module.get_logger()
+    logger.info("hello from test")
+    for handler in logger.handlers:
+        handler.flush()
+    assert "hello from test" in (tmp_path / "logs" / log_file).read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("module, expected", [
+    (chapter_generation, 0),
+    (text_extraction, 1),
+    (openai_utils, 1),
+])
+def test_console_line_emitted_at_most_once(capsys, fresh_loggers, module, expected):
+    logging.basicConfig(level=logging.INFO)
+    module.get_logger().info("console once")
+    assert capsys.readouterr().err.count("console once") == expected
+
+
+def test_generate_chapterwise_json_logs_to_file(tmp_path, fresh_loggers):
+    logging.basicConfig(level=logging.INFO)
+    pagewise = tmp_path / "pagewise.json"
+    pagewise.write_text('[{"page_number": 1, "content": "1 - Intro\\ntext\\n1"}]', encoding="utf-8")
+    chapter_generation.generate_chapterwise_json(str(pagewise), output_folder=str(tmp_path / "chapters"))
+    assert "Chapterwise JSON files created" in (tmp_path / "logs" / "chapter_generation.log").read_text(encoding="utf-8")
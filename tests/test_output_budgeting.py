@@ -0,0 +1,149 @@
+from src import openai_utils as ou
+
+
+def test_estimate_completion_tokens_grows_with_counts():
+    empty = ou.estimate_completion_tokens({"mcq": 0, "tf": 0, "short": 0})
+    assert empty == ou.RESPONSE_OVERHEAD_TOKENS
+    one_mcq = ou.estimate_completion_tokens({"mcq": 1, "tf": 0, "short": 0})
+    assert one_mcq == ou.RESPONSE_OVERHEAD_TOKENS + int(
+        ou.QUESTION_TOKEN_ESTIMATES["mcq"] * ou.TOKEN_ESTIMATE_MARGIN
+    )
+    assert ou.estimate_completion_tokens({"mcq": 20, "tf": 20, "short": 20}) > 1024
+
+
+def test_estimate_completion_tokens_treats_missing_types_as_zero():
+    assert ou.estimate_completion_tokens({"tf": 2}) == ou.estimate_completion_tokens(
+        {"mcq": 0, "tf": 2, "short": 0}
+    )
+
+
+def test_split_question_counts_keeps_small_request_whole():
+    counts = {"mcq": 2, "tf": 2, "short": 2}
+    assert ou.split_question_counts(counts) == [counts]
+
+
+def test_split_question_counts_splits_by_type_then_chunks():
+    counts = {"mcq": 40, "tf": 0, "short": 2}
+    parts = ou.split_question_counts(counts)
+    assert all(ou.estimate_completion_tokens(part) <= ou.MAX_COMPLETION_TOKENS for part in parts)
+    assert all(ou.single_question_type(part) for part in parts)
+    for q_type in counts:
+        assert sum(part[q_type] for part in parts) == counts[q_type]
+    assert len(parts) == 3
+
+
+def test_split_question_counts_handles_tiny_budget():
+    parts = ou.split_question_counts({"mcq": 3, "tf": 0, "short": 0}, max_tokens=10)
+    assert parts == [{"mcq": 1, "tf": 0, "short": 0}] * 3
+
+
+def test_count_completed_questions_drops_truncated_tail():
+    text = (
+        "MCQ:\nQ1. a [Domain: Knowledge]\nA. w\nB. x\nC. y\nD. z\nAnswer: A\n\n"
+        "Q2. b [Domain: Analysis]\nA. w\nAnswer: B\n\n"
+        "True/False:\nQ1. t [Domain: Knowledge] (True/False)\nAnswer: True\n"
+        "Q2. cut off mid"
+    )
+    counts, trimmed = ou.count_completed_questions(text)
+    assert counts == {"mcq": 2, "tf": 1, "short": 0}
+    assert trimmed.endswith("Answer: True")
+
+
+def test_count_completed_questions_accepts_markdown_bold():
+    text = (
+        "**MCQ:**\n**Q1.** a\nA. w\n**Answer:** A\n\n"
+        "### Short Answer\nQ1. s\n**Answer**: s\n"
+    )
+    counts, trimmed = ou.count_completed_questions(text)
+    assert counts == {"mcq": 1, "tf": 0, "short": 1}
+    assert trimmed.endswith("**Answer**: s")
+
+
+def test_count_completed_questions_without_section_headers():
+    text = "Q1. s\nAnswer: s\n\nQ2. t\nAnswer: t\n\nQ3. partial"
+    assert ou.count_completed_questions(text) == ({"mcq": 0, "tf": 0, "short": 0}, "")
+    counts, trimmed = ou.count_completed_questions(text, default_type="short")
+    assert counts == {"mcq": 0, "tf": 0, "short": 2}
+    assert trimmed == "Q1. s\nAnswer: s\n\nQ2. t\nAnswer: t"
+
+
+def test_merge_question_outputs_renumbers_into_single_sections():
+    first = "MCQ:\nQ1. a\nAnswer: A\n\nQ2. b\nAnswer: B\n\nQ3. cut"
+    second = "MCQ:\nQ1. c\nAnswer: C\n\nTrue/False:\nQ1. t\nAnswer: True"
+    merged = ou.merge_question_outputs([first, second], truncated=[True, False])
+    assert merged == (
+        "MCQ:\nQ1. a\nAnswer: A\n\nQ2. b\nAnswer: B\n\nQ3. c\nAnswer: C\n\n"
+        "True/False:\nQ1. t\nAnswer: True"
+    )
+
+
+def test_merge_question_outputs_keeps_finished_outputs_whole():
+    mcq = "MCQ:\nQ1. a\nA. x\nCorrect Answer: A\n\nQ2. b\nA. x\nAnswer: B"
+    tf = "True/False:\nQ1. t (True/False)\nAns: True"
+    merged = ou.merge_question_outputs([mcq, tf], ["mcq", "tf"])
+    assert merged == (
+        "MCQ:\nQ1. a\nA. x\nCorrect Answer: A\n\nQ2. b\nA. x\nAnswer: B\n\n"
+        "True/False:\nQ1. t (True/False)\nAns: True"
+    )
+
+
+def test_merge_question_outputs_keeps_unanswered_blocks_of_finished_output():
+    merged = ou.merge_question_outputs(["Short Answer:\nQ1. s\nSample response: s"])
+    assert merged == "Short Answer:\nQ1. s\nSample response: s"
+
+
+def test_merge_question_outputs_drops_only_trailing_block_of_truncated_output():
+    text = "MCQ:\nQ1. a\nSolution - A\n\nQ2. b\nAnswer: B\n\nQ3. cut"
+    assert ou.merge_question_outputs([text], truncated=[True]) == (
+        "MCQ:\nQ1. a\nSolution - A\n\nQ2. b\nAnswer: B"
+    )
+
+
+def test_count_completed_questions_accepts_answer_variants():
+    text = "MCQ:\nQ1. a\nCorrect Answer: A\n\nTrue/False:\nQ1. t\nAns: True\nQ2. u\nAnswer - False"
+    counts, _ = ou.count_completed_questions(text)
+    assert counts == {"mcq": 1, "tf": 2, "short": 0}
+
+
+def test_merge_question_outputs_falls_back_for_unparseable_text():
+    assert ou.merge_question_outputs(["MCQ:\nQ1. a\nAnswer: A", "free text"]) == (
+        "MCQ:\nQ1. a\nAnswer: A\n\nfree text"
+    )
+
+
+def test_generate_with_continuation_requests_only_missing(monkeypatch):
+    responses = [
+        ("MCQ:\nQ1. a\nAnswer: A\n\nQ2. b\nAnswer: B\n\nQ3. cut", "length"),
+        ("MCQ:\nQ3. c\nAnswer: C\n\nTrue/False:\nQ1. t\nAnswer: True", "stop"),
+    ]
+    calls = []
+
+    def fake_call(prompt, model=None, max_tokens=None):
+        calls.append((prompt, max_tokens))
+        return responses[len(calls) - 1]
+
+    monkeypatch.setattr(ou, "call_openai_with_finish_reason", fake_call)
+    chapter = {"file": "chapter_1.json", "name": "Chapter 1", "content": "content"}
+    result = ou.generate_with_continuation(chapter, {"mcq": 3, "tf": 1, "short": 0}, "Easy", ["Knowledge"])
+
+    assert result.count("MCQ:") == 1
+    assert "Q3. c" in result and "Q1. t" in result
+    continuation_prompt, continuation_tokens = calls[1]
+    assert "MCQ: 1 more, numbered from Q3" in continuation_prompt
+    assert "True/False: 1 more, numbered from Q1" in continuation_prompt
+    assert "- a\n- b\n" in continuation_prompt
+    assert continuation_tokens == ou.estimate_completion_tokens({"mcq": 1, "tf": 1, "short": 0})
+
+
+def test_generate_with_continuation_returns_untruncated_output_as_is(monkeypatch):
+    monkeypatch.setattr(
+        ou, "call_openai_with_finish_reason", lambda prompt, model=None, max_tokens=None: ("raw text", "stop")
+    )
+    chapter = {"file": "chapter_1.json", "name": "Chapter 1", "content": "content"}
+    assert ou.generate_with_continuation(chapter, {"mcq": 1, "tf": 0, "short": 0}, "Easy", ["Knowledge"]) == "raw text"
+
+
+def test_measure_question_token_averages():
+    text = "MCQ:\nQ1. aa\nAnswer: A\n\nQ2. bbbb\nAnswer: B\n\nTrue/False:\nQ1. t\nAnswer: True"
+    averages = ou.measure_question_token_averages([text], count_tokens=lambda s: len(s.split()))
+    assert averages == {"mcq": 4, "tf": 4}